@@ -0,0 +1 @@
+"""Carbon Footprint Tracker backend (FastAPI service)."""
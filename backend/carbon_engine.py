@@ -4,11 +4,13 @@ This module provide logic to calculate CO2e emissions for different categories.
 Weights are in kg CO2e per unit (km for transport, kg for food, kWh for energy).
 """
 
-from typing import Dict, List, Optional, Union
+import os
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
 
 # Default Emission Factors (kg CO2e per unit)
 # Sources vary, these are representative averages.
-DEFAULT_EMISSION_FACTORS = {
+_DEFAULT_FACTORS = {
     "transport": {
         "car": 0.17,      # Average car (gasoline) per km
         "bus": 0.08,      # Average bus per km per passenger
@@ -28,6 +30,44 @@ DEFAULT_EMISSION_FACTORS = {
     }
 }
 
+# Read-only views so callers can't change the defaults
+DEFAULT_EMISSION_FACTORS = MappingProxyType(
+    {category: MappingProxyType(table) for category, table in _DEFAULT_FACTORS.items()}
+)
+
+# The calculators read the plain dicts: dict.get is cheaper than going through a proxy
+_TRANSPORT_FACTORS = _DEFAULT_FACTORS["transport"]
+_FOOD_FACTORS = _DEFAULT_FACTORS["food"]
+_ENERGY_FACTORS = _DEFAULT_FACTORS["energy"]
+
+class Footprint(NamedTuple):
+    """Total carbon footprint with its per-category breakdown (kg CO2e)."""
+    transport: float
+    food: float
+    energy: float
+    total: float
+
+    def to_dict(self) -> Dict[str, Union[float, Dict[str, float]]]:
+        """Serializes to the API's {'total_kg_co2e', 'breakdown'} shape."""
+        return {
+            "total_kg_co2e": self.total,
+            "breakdown": {
+                "transport": self.transport,
+                "food": self.food,
+                "energy": self.energy
+            }
+        }
+
+def _category_total(
+    entries: List[Dict[str, Union[str, float]]],
+    type_field: str,
+    quantity_field: str,
+    calculate: Callable[[str, float, Optional[Mapping[str, float]]], float],
+    factors: Optional[Mapping[str, float]]
+) -> float:
+    """Sums one category's emissions over a materialized list (no generator frames)."""
+    return sum([calculate(e[type_field], e[quantity_field], factors) for e in entries])
+
 def calculate_transport_emissions(
     mode: str, 
     distance_km: float, 
@@ -35,7 +75,7 @@ def calculate_transport_emissions(
 ) -> float:
     """Calculates transport emissions in kg CO2e."""
     if factors is None:
-        factors = DEFAULT_EMISSION_FACTORS["transport"]
+        factors = _TRANSPORT_FACTORS
     
     factor = factors.get(mode.lower(), 0.0)
     return distance_km * factor
@@ -47,7 +87,7 @@ def calculate_food_emissions(
 ) -> float:
     """Calculates food emissions in kg CO2e."""
     if factors is None:
-        factors = DEFAULT_EMISSION_FACTORS["food"]
+        factors = _FOOD_FACTORS
     
     factor = factors.get(food_type.lower(), 0.0)
     return quantity_kg * factor
@@ -59,17 +99,79 @@ def calculate_energy_emissions(
 ) -> float:
     """Calculates energy emissions in kg CO2e."""
     if factors is None:
-        factors = DEFAULT_EMISSION_FACTORS["energy"]
+        factors = _ENERGY_FACTORS
     
     factor = factors.get(energy_type.lower(), 0.0)
     return kwh * factor
 
+def calculate_combined_emissions(
+    mode: str,
+    distance_km: float,
+    food_type: str,
+    quantity_kg: float,
+    kwh: float
+) -> Tuple[float, float, float, float]:
+    """
+    Calculates one transport, food and electricity entry in a single call
+    using the default factors. Returns (transport, food, energy, total) in kg CO2e.
+    """
+    transport = _TRANSPORT_FACTORS.get(mode.lower(), 0.0) * distance_km
+    food = _FOOD_FACTORS.get(food_type.lower(), 0.0) * quantity_kg
+    energy = _ENERGY_FACTORS["electricity"] * kwh
+    return transport, food, energy, transport + food + energy
+
+def make_specialized_calculator(
+    n_transport: int,
+    n_food: int,
+    n_energy: int
+) -> Callable[..., Tuple[float, float, float]]:
+    """
+    Generates a calculator with the per-entry loops unrolled for a fixed payload shape.
+    
+    The returned function takes (transport_entries, food_entries, energy_entries,
+    transport_factors, food_factors, energy_factors) and returns the three category totals.
+    """
+    def unrolled(entries: str, factors: str, type_field: str, quantity_field: str, count: int) -> str:
+        terms = [
+            f"{factors}.get({entries}[{i}][{type_field!r}].lower(), 0.0) * {entries}[{i}][{quantity_field!r}]"
+            for i in range(count)
+        ]
+        return " + ".join(terms) or "0.0"
+    
+    source = (
+        "def calculate(t, f, e, tf, ff, ef):\n"
+        f"    return (\n"
+        f"        {unrolled('t', 'tf', 'mode', 'distance', n_transport)},\n"
+        f"        {unrolled('f', 'ff', 'type', 'quantity', n_food)},\n"
+        f"        {unrolled('e', 'ef', 'type', 'kwh', n_energy)}\n"
+        f"    )\n"
+    )
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+    return namespace["calculate"]
+
+# Unrolled calculators, keyed by (n_transport, n_food, n_energy). Only shapes
+# registered up front are specialized, so request data can never trigger exec.
+_SPECIALIZED_CALCULATORS: Dict[Tuple[int, int, int], Callable[..., Tuple[float, float, float]]] = {}
+
+# Comma-separated shapes to specialize at import, e.g. "1x1x1,3x2x1"
+SPECIALIZED_SHAPES_ENV = "CARBON_TRACKER_SPECIALIZED_SHAPES"
+
+def register_specialized_shape(n_transport: int, n_food: int, n_energy: int) -> None:
+    """Makes calculate_total_footprint use an unrolled calculator for payloads of this shape."""
+    shape = (n_transport, n_food, n_energy)
+    if shape not in _SPECIALIZED_CALCULATORS:
+        _SPECIALIZED_CALCULATORS[shape] = make_specialized_calculator(*shape)
+
+for _shape in filter(None, os.environ.get(SPECIALIZED_SHAPES_ENV, "").split(",")):
+    register_specialized_shape(*(int(n) for n in _shape.strip().lower().split("x")))
+
 def calculate_total_footprint(
     transport_entries: List[Dict[str, Union[str, float]]],
     food_entries: List[Dict[str, Union[str, float]]],
     energy_entries: List[Dict[str, Union[str, float]]],
     custom_factors: Optional[Dict[str, Dict[str, float]]] = None
-) -> Dict[str, Union[float, Dict[str, float]]]:
+) -> Footprint:
     """
     Calculates total carbon footprint and provides a breakdown.
     
@@ -82,31 +184,35 @@ def calculate_total_footprint(
     f_factors = custom_factors.get("food") if custom_factors else None
     e_factors = custom_factors.get("energy") if custom_factors else None
 
-    transport_total = sum(
-        calculate_transport_emissions(e['mode'], e['distance'], t_factors) 
-        for e in transport_entries
-    )
-    
-    food_total = sum(
-        calculate_food_emissions(e['type'], e['quantity'], f_factors) 
-        for e in food_entries
-    )
-    
-    energy_total = sum(
-        calculate_energy_emissions(e['type'], e['kwh'], e_factors) 
-        for e in energy_entries
+    calculate = _SPECIALIZED_CALCULATORS and _SPECIALIZED_CALCULATORS.get(
+        (len(transport_entries), len(food_entries), len(energy_entries))
     )
+    if calculate:
+        transport_total, food_total, energy_total = calculate(
+            transport_entries, food_entries, energy_entries,
+            _TRANSPORT_FACTORS if t_factors is None else t_factors,
+            _FOOD_FACTORS if f_factors is None else f_factors,
+            _ENERGY_FACTORS if e_factors is None else e_factors
+        )
+    else:
+        transport_total = _category_total(
+            transport_entries, 'mode', 'distance', calculate_transport_emissions, t_factors
+        )
+        food_total = _category_total(
+            food_entries, 'type', 'quantity', calculate_food_emissions, f_factors
+        )
+        energy_total = _category_total(
+            energy_entries, 'type', 'kwh', calculate_energy_emissions, e_factors
+        )
     
     total = transport_total + food_total + energy_total
     
-    return {
-        "total_kg_co2e": round(total, 4),
-        "breakdown": {
-            "transport": round(transport_total, 4),
-            "food": round(food_total, 4),
-            "energy": round(energy_total, 4)
-        }
-    }
+    return Footprint(
+        round(transport_total, 4),
+        round(food_total, 4),
+        round(energy_total, 4),
+        round(total, 4)
+    )
 
 if __name__ == "__main__":
     # Example usage / Simple Verification
@@ -115,5 +221,5 @@ if __name__ == "__main__":
     sample_energy = [{"type": "electricity", "kwh": 50}]
     
     result = calculate_total_footprint(sample_transport, sample_food, sample_energy)
-    print(f"Total Carbon Footprint: {result['total_kg_co2e']} kg CO2e")
-    print(f"Breakdown: {result['breakdown']}")
+    print(f"Total Carbon Footprint: {result.total} kg CO2e")
+    print(f"Breakdown: {result.to_dict()['breakdown']}")
@@ -1,47 +1,44 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict
 from typing import Dict, Any, List
 
-# Importing individual modules
-# We assume the modules are in the same directory (backend/)
-try:
-    from .carbon_engine import (
-        calculate_transport_emissions,
-        calculate_food_emissions,
-        calculate_energy_emissions
-    )
-    from .gamification import calculate_daily_score, get_badges
-    from .recommendation_engine import build_recommendation_prompt
-except ImportError:
-    from carbon_engine import (
-        calculate_transport_emissions,
-        calculate_food_emissions,
-        calculate_energy_emissions
-    )
-    from gamification import calculate_daily_score, get_badges
-    from recommendation_engine import build_recommendation_prompt
+from .carbon_engine import calculate_combined_emissions
+from .gamification import calculate_daily_score, get_badges
+from .recommendation_engine import build_recommendation_prompt, prompt_disk_cache_enabled
 
 router = APIRouter()
 
 class DemoRunRequest(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
     transport_mode: str
     distance: float
     food_type: str
     food_quantity: float
     energy_kwh: float
 
-@router.post("/demo-run")
+class DemoRunResponse(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
+    transport_emission: float
+    food_emission: float
+    energy_emission: float
+    total_emission: float
+    daily_score: int
+    badges: List[Dict[str, str]]
+    recommendation_prompt: str
+
+@router.post("/demo-run", response_model=DemoRunResponse)
 async def run_integrated_demo(req: DemoRunRequest):
     """
     Computes a full demo lifecycle: emissions -> gamification -> AI recommendations.
     """
     try:
         # 1. Carbon Calculations
-        transport_emission = calculate_transport_emissions(req.transport_mode, req.distance)
-        food_emission = calculate_food_emissions(req.food_type, req.food_quantity)
-        energy_emission = calculate_energy_emissions("electricity", req.energy_kwh)
-        
-        total_emission = transport_emission + food_emission + energy_emission
+        transport_emission, food_emission, energy_emission, total_emission = calculate_combined_emissions(
+            req.transport_mode, req.distance, req.food_type, req.food_quantity, req.energy_kwh
+        )
         
         # Breakdown for recommendation engine
         breakdown = {
@@ -62,7 +59,11 @@ async def run_integrated_demo(req: DemoRunRequest):
         
         # 3. AI Recommendations (Prompt Building)
         habit_summary = f"I traveled {req.distance}km by {req.transport_mode}, consumed {req.food_quantity}kg of {req.food_type}, and used {req.energy_kwh}kWh of electricity."
-        recommendation_prompt = build_recommendation_prompt(breakdown, habit_summary)
+        if prompt_disk_cache_enabled():
+            # The disk cache does blocking SQLite I/O; keep it off the event loop
+            recommendation_prompt = await run_in_threadpool(build_recommendation_prompt, breakdown, habit_summary)
+        else:
+            recommendation_prompt = build_recommendation_prompt(breakdown, habit_summary)
         
         # 4. Assembly
         return {
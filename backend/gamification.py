@@ -3,29 +3,54 @@ Gamification and Scoring Module
 Provides logic for user engagement through scores, streaks, and badges.
 """
 
-from typing import List, Dict, Any, Tuple
+import bisect
+from functools import lru_cache
+from math import inf
+from types import MappingProxyType
+from typing import List, Dict, Any, NamedTuple, Tuple
 
 # Constants for thresholds and scoring
 DAILY_CARBON_GOAL_KG = 20.0  # Threshold for a 'perfect' score
 SCORE_MULTIPLIER = 5.0      # Weight for carbon reduction in score calculation
-STREAK_BONUS_MILESTONES = {
+STREAK_BONUS_MILESTONES = MappingProxyType({
     3: 50,    # 3-day streak bonus points
     7: 150,   # 7-day streak bonus points
-}
+})
 
-LEVELS = [
+LEVELS = (
     (0, "Seedling"),
     (500, "Sapling"),
     (1500, "Oak"),
     (3000, "Forest Guardian"),
     (5000, "Planet Hero")
-]
+)
 
-BADGE_DEFINITIONS = [
-    {"id": "green_traveler", "name": "Green Traveler", "description": "Transport footprint below 5kg.", "transport_max": 5.0},
-    {"id": "eco_warrior", "name": "Eco Warrior", "description": "Maintain a 7-day activity streak.", "min_streak": 7},
-    {"id": "low_utility", "name": "Energy Saver", "description": "Reduce daily energy use below 10kWh.", "energy_max": 10.0}
-]
+# Points lost per kg CO2e in calculate_daily_score
+_SCORE_SLOPE = 100.0 / DAILY_CARBON_GOAL_KG
+
+# Parallel lookup tables for get_progress_level (thresholds must stay ascending)
+_LEVEL_THRESHOLDS = tuple(threshold for threshold, _ in LEVELS)
+_LEVEL_NAMES = tuple(name for _, name in LEVELS)
+
+class BadgeDefinition(NamedTuple):
+    """A badge and its criteria; inf / -inf mean the criterion does not apply."""
+    id: str
+    name: str
+    description: str
+    transport_max: float = inf
+    min_streak: float = -inf
+    energy_max: float = inf
+
+BADGE_DEFINITIONS = (
+    BadgeDefinition("green_traveler", "Green Traveler", "Transport footprint below 5kg.", transport_max=5.0),
+    BadgeDefinition("eco_warrior", "Eco Warrior", "Maintain a 7-day activity streak.", min_streak=7),
+    BadgeDefinition("low_utility", "Energy Saver", "Reduce daily energy use below 10kWh.", energy_max=10.0)
+)
+
+_BADGE_META = tuple(
+    {"id": b.id, "name": b.name, "description": b.description}
+    for b in BADGE_DEFINITIONS
+)
 
 def calculate_daily_score(total_carbon_kg: float) -> int:
     """
@@ -34,8 +59,9 @@ def calculate_daily_score(total_carbon_kg: float) -> int:
     """
     # Simple linear decay starting from 100
     # If carbon is 0, score is 100. If carbon >= DAILY_CARBON_GOAL_KG, score is 0.
-    raw_score = 100 - (total_carbon_kg * (100 / DAILY_CARBON_GOAL_KG))
-    return int(max(0, min(100, raw_score)))
+    s = 100.0 - total_carbon_kg * _SCORE_SLOPE
+    # "not s < 100" also catches NaN, which the old min/max clamp mapped to 100
+    return 0 if s <= 0 else 100 if not s < 100 else int(s)
 
 def calculate_weekly_streak(active_days_count: int) -> Tuple[str, int]:
     """
@@ -60,43 +86,30 @@ def get_badges(
     """
     Returns a list of earned badges based on current activity.
     """
-    earned = []
-    for badge in BADGE_DEFINITIONS:
-        is_earned = True
-        
-        if "transport_max" in badge and transport_kg > badge["transport_max"]:
-            is_earned = False
-        if "min_streak" in badge and streak_days < badge["min_streak"]:
-            is_earned = False
-        if "energy_max" in badge and energy_kwh > badge["energy_max"]:
-            is_earned = False
-            
-        if is_earned:
-            earned.append({
-                "id": badge["id"],
-                "name": badge["name"],
-                "description": badge["description"]
-            })
-            
-    return earned
+    # total_carbon_kg isn't a badge criterion, so it's left out of the cache key
+    # Copies, so callers can't mutate the shared badge metadata
+    return [dict(_BADGE_META[i]) for i in _earned_badge_indices(streak_days, transport_kg, energy_kwh)]
+
+@lru_cache(maxsize=8192)
+def _earned_badge_indices(streak_days: int, transport_kg: float, energy_kwh: float) -> Tuple[int, ...]:
+    # Written as "not failed" so NaN inputs never fail a criterion, as before
+    return tuple([
+        i for i, badge in enumerate(BADGE_DEFINITIONS)
+        if not (
+            transport_kg > badge.transport_max
+            or streak_days < badge.min_streak
+            or energy_kwh > badge.energy_max
+        )
+    ])
 
 def get_progress_level(total_points: int) -> Dict[str, Any]:
     """
     Returns the user's current level name and level number based on total points.
     """
-    current_level_name = LEVELS[0][1]
-    level_num = 1
-    
-    for i, (threshold, name) in enumerate(LEVELS):
-        if total_points >= threshold:
-            current_level_name = name
-            level_num = i + 1
-        else:
-            break
-            
+    i = max(0, bisect.bisect_right(_LEVEL_THRESHOLDS, total_points) - 1)
     return {
-        "level_name": current_level_name,
-        "level_number": level_num,
+        "level_name": _LEVEL_NAMES[i],
+        "level_number": i + 1,
         "total_points": total_points
     }
 
@@ -1,30 +1,20 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, ValidationError
+from typing import Annotated, Any, Dict, List, Optional, Type, TypeVar, Union
+import email.message
+import json
+import msgspec
 import sys
-import os
 
-# Add the current directory to sys.path to import carbon_engine
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-try:
-    from carbon_engine import (
-        calculate_transport_emissions,
-        calculate_food_emissions,
-        calculate_energy_emissions,
-        calculate_total_footprint
-    )
-    from demo_api import router as demo_router
-except ImportError:
-    # Handle cases where the engine might be in a different path during dev
-    from .carbon_engine import (
-        calculate_transport_emissions,
-        calculate_food_emissions,
-        calculate_energy_emissions,
-        calculate_total_footprint
-    )
-    from .demo_api import router as demo_router
+from .carbon_engine import (
+    calculate_transport_emissions,
+    calculate_food_emissions,
+    calculate_energy_emissions,
+    calculate_total_footprint
+)
+from .demo_api import router as demo_router
 
 app = FastAPI(title="Carbon Footprint Tracker API")
 
@@ -43,14 +33,20 @@ app.include_router(demo_router, prefix="/api", tags=["demo"])
 # --- Pydantic Models ---
 
 class TransportRequest(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
     mode: str
     distance: float
 
 class FoodRequest(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
     type: str
     quantity: float
 
 class EnergyRequest(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
     type: str
     kwh: float
 
@@ -59,32 +55,171 @@ class TotalCalculationRequest(BaseModel):
     food: List[dict]      # list of {'type': str, 'quantity': float}
     energy: List[dict]    # list of {'type': str, 'kwh': float}
 
+# Response models let FastAPI serialize straight to JSON bytes via Pydantic.
+# Non-finite results fail response validation (500) instead of becoming null.
+
+class EmissionResponse(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
+    carbon_footprint_kg: float
+
+class FootprintBreakdown(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
+    transport: float
+    food: float
+    energy: float
+
+class TotalCalculationResponse(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
+    total_kg_co2e: float
+    breakdown: FootprintBreakdown
+
+# --- msgspec Payloads ---
+
+# The scalar endpoints decode well-formed bodies with these strict structs,
+# which is much cheaper than Pydantic validation for two-field payloads.
+# Out-of-range numbers (e.g. 1e400) fall through to the Pydantic models, which reject them.
+FiniteFloat = Annotated[float, msgspec.Meta(ge=-sys.float_info.max, le=sys.float_info.max)]
+
+class TransportPayload(msgspec.Struct):
+    mode: str
+    distance: FiniteFloat
+
+class FoodPayload(msgspec.Struct):
+    type: str
+    quantity: FiniteFloat
+
+class EnergyPayload(msgspec.Struct):
+    type: str
+    kwh: FiniteFloat
+
+PayloadT = TypeVar("PayloadT", bound=msgspec.Struct)
+
+def is_json_content_type(content_type: Optional[str]) -> bool:
+    """Mirrors FastAPI's check: application/json or application/*+json; missing is not JSON."""
+    if content_type == "application/json":
+        return True
+    if not content_type:
+        return False
+    message = email.message.Message()
+    message["content-type"] = content_type
+    if message.get_content_maintype() != "application":
+        return False
+    subtype = message.get_content_subtype()
+    return subtype == "json" or subtype.endswith("+json")
+
+async def decode_body(
+    request: Request,
+    payload_type: Type[PayloadT],
+    model: Type[BaseModel]
+) -> Union[PayloadT, BaseModel]:
+    """
+    Decodes a JSON request body with msgspec. Bodies it rejects are re-validated
+    with the Pydantic model, so lax coercion (e.g. "10" -> 10.0) and 422 error
+    details stay the same as a regular FastAPI body parameter. Non-JSON content
+    types are never parsed as JSON, which keeps these endpoints out of reach of
+    CORS "simple" (form/text) requests.
+    """
+    body = await request.body()
+    is_json = is_json_content_type(request.headers.get("content-type"))
+    if is_json:
+        try:
+            return msgspec.json.decode(body, type=payload_type)
+        except msgspec.DecodeError:
+            pass
+
+    if not body:
+        raise RequestValidationError(
+            [{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}]
+        )
+    data: Any = body
+    if is_json:
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise RequestValidationError([{
+                "type": "json_invalid",
+                "loc": ("body", e.pos),
+                "msg": "JSON decode error",
+                "input": {},
+                "ctx": {"error": e.msg}
+            }])
+    try:
+        return model.model_validate(data, from_attributes=True)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+_BODY_MODELS: List[Type[BaseModel]] = []
+
+def json_body(model: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI requestBody for endpoints that read the raw request body."""
+    _BODY_MODELS.append(model)
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{model.__name__}"}}},
+            "required": True
+        },
+        "responses": {
+            "422": {
+                "description": "Validation Error",
+                "content": {"application/json": {"schema": {"$ref": "#/components/schemas/HTTPValidationError"}}}
+            }
+        }
+    }
+
+def openapi() -> Dict[str, Any]:
+    """Adds the raw-body request models to the generated schema's components."""
+    if app.openapi_schema is None:
+        schemas = FastAPI.openapi(app).setdefault("components", {}).setdefault("schemas", {})
+        for model in _BODY_MODELS:
+            schemas[model.__name__] = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    return app.openapi_schema
+
+app.openapi = openapi
+
 # --- Endpoints ---
 
-@app.post("/transport")
-async def transport_emissions(req: TransportRequest):
+@app.post("/transport", response_model=EmissionResponse, openapi_extra=json_body(TransportRequest))
+async def transport_emissions(request: Request):
+    req = await decode_body(request, TransportPayload, TransportRequest)
     result = calculate_transport_emissions(req.mode, req.distance)
     return {"carbon_footprint_kg": round(result, 4)}
 
-@app.post("/food")
-async def food_emissions(req: FoodRequest):
+@app.post("/food", response_model=EmissionResponse, openapi_extra=json_body(FoodRequest))
+async def food_emissions(request: Request):
+    req = await decode_body(request, FoodPayload, FoodRequest)
     result = calculate_food_emissions(req.type, req.quantity)
     return {"carbon_footprint_kg": round(result, 4)}
 
-@app.post("/energy")
-async def energy_emissions(req: EnergyRequest):
+@app.post("/energy", response_model=EmissionResponse, openapi_extra=json_body(EnergyRequest))
+async def energy_emissions(request: Request):
+    req = await decode_body(request, EnergyPayload, EnergyRequest)
     result = calculate_energy_emissions(req.type, req.kwh)
     return {"carbon_footprint_kg": round(result, 4)}
 
-@app.post("/calculate-total")
+@app.post("/calculate-total", response_model=TotalCalculationResponse)
 async def total_calculation(req: TotalCalculationRequest):
     result = calculate_total_footprint(req.transport, req.food, req.energy)
-    return result
+    return result.to_dict()
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "backend.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=os.cpu_count(),
+        log_level="warning",
+        access_log=False
+    )
@@ -1,33 +1,29 @@
-from typing import Dict, Any
+import hashlib
+import os
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Any, Tuple
 
-def build_recommendation_prompt(carbon_breakdown: Dict[str, float], activity_summary: str) -> str:
-    """
-    Constructs a structured prompt for an LLM to provide sustainability recommendations.
-    
-    carbon_breakdown: {'transport': float, 'food': float, 'energy': float, 'total': float}
-    activity_summary: A short text description of the user's recent habits.
-    """
-    
-    # Identify highest emission category
-    categories = {k: v for k, v in carbon_breakdown.items() if k != 'total'}
-    highest_category = max(categories, key=categories.get) if categories else "N/A"
-    highest_value = categories.get(highest_category, 0)
-    
-    prompt = f"""
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+_PROMPT_TEMPLATE = """
 Act as a Sustainability Expert and Carbon Footprint Consultant.
 Your goal is to analyze a user's carbon footprint data and provide actionable, realistic, and prioritized recommendations to reduce their environmental impact.
 
 ### User Carbon Footprint Data (kg CO2e):
-- **Total Footprint**: {carbon_breakdown.get('total', 0):.2f}
-- **Transport**: {carbon_breakdown.get('transport', 0):.2f}
-- **Food**: {carbon_breakdown.get('food', 0):.2f}
-- **Energy**: {carbon_breakdown.get('energy', 0):.2f}
+- **Total Footprint**: {total:.2f}
+- **Transport**: {transport:.2f}
+- **Food**: {food:.2f}
+- **Energy**: {energy:.2f}
 
 ### User's Recent Activity Summary:
 "{activity_summary}"
 
 ### Analysis:
-- The highest contributor to the user's footprint is **{highest_category.capitalize()}** ({highest_value:.2f} kg CO2e).
+- The highest contributor to the user's footprint is **{highest_category}** ({highest_value:.2f} kg CO2e).
 
 ### Task:
 Please provide 5–7 specific and realistic recommendations to reduce this carbon footprint. 
@@ -43,8 +39,98 @@ For each recommendation, include:
 - Do not use generic advice; keep it specific to the identified problem areas.
 
 Recommendations:
-"""
-    return prompt.strip()
+""".strip()
+
+# Optional persistent prompt cache shared across processes and restarts. It is
+# off unless PROMPT_CACHE_DIR_ENV names a directory (and diskcache is installed).
+# Keys include a digest of the template so edits to it never serve stale prompts.
+_TEMPLATE_DIGEST = hashlib.blake2b(_PROMPT_TEMPLATE.encode(), digest_size=8).digest()
+
+PROMPT_CACHE_DIR_ENV = "CARBON_TRACKER_PROMPT_CACHE_DIR"
+
+def prompt_disk_cache_enabled() -> bool:
+    """
+    True if prompts may hit the disk cache. Async callers should then build
+    prompts in a worker thread, since cache reads and writes block.
+    """
+    return diskcache is not None and bool(os.environ.get(PROMPT_CACHE_DIR_ENV))
+
+@lru_cache(maxsize=None)
+def _get_disk_cache() -> Any:
+    """
+    Opens the persistent prompt cache on first use, or returns None if disabled.
+    diskcache unpickles stored values, so only a directory private to the
+    current user is accepted.
+    """
+    if not prompt_disk_cache_enabled():
+        return None
+    
+    directory = os.environ[PROMPT_CACHE_DIR_ENV]
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.stat(directory)
+    except OSError:
+        return None
+    if st.st_mode & 0o077 or (hasattr(os, "getuid") and st.st_uid != os.getuid()):
+        return None
+    return diskcache.Cache(directory, size_limit=256 << 20)
+
+def build_recommendation_prompt(carbon_breakdown: Dict[str, float], activity_summary: str) -> str:
+    """
+    Constructs a structured prompt for an LLM to provide sustainability recommendations.
+    
+    carbon_breakdown: {'transport': float, 'food': float, 'energy': float, 'total': float}
+    activity_summary: A short text description of the user's recent habits.
+    """
+    # Identify highest emission category (from the unrounded values)
+    categories = [(k, v) for k, v in carbon_breakdown.items() if k != 'total']
+    highest_category = max(categories, key=itemgetter(1))[0] if categories else "N/A"
+    
+    # Values are rounded to the 2 dp the prompt displays so near-identical
+    # breakdowns share cache entries. The highest category is part of the key
+    # because rounding can turn a clear winner into a tie.
+    breakdown_items = tuple((k, round(v, 2)) for k, v in carbon_breakdown.items())
+    return _build_prompt_cached(breakdown_items, highest_category, activity_summary)
+
+@lru_cache(maxsize=512)
+def _build_prompt_cached(
+    breakdown_items: Tuple[Tuple[str, float], ...],
+    highest_category: str,
+    activity_summary: str
+) -> str:
+    disk_cache = _get_disk_cache()
+    if disk_cache is None:
+        return _render_prompt(breakdown_items, highest_category, activity_summary)
+    
+    key = (
+        _TEMPLATE_DIGEST,
+        breakdown_items,
+        highest_category,
+        hashlib.blake2b(activity_summary.encode(), digest_size=16).digest()
+    )
+    prompt = disk_cache.get(key)
+    if prompt is None:
+        prompt = _render_prompt(breakdown_items, highest_category, activity_summary)
+        disk_cache.set(key, prompt)
+    return prompt
+
+def _render_prompt(
+    breakdown_items: Tuple[Tuple[str, float], ...],
+    highest_category: str,
+    activity_summary: str
+) -> str:
+    carbon_breakdown = dict(breakdown_items)
+    highest_value = carbon_breakdown.get(highest_category, 0)
+    
+    return _PROMPT_TEMPLATE.format_map({
+        "total": carbon_breakdown.get('total', 0),
+        "transport": carbon_breakdown.get('transport', 0),
+        "food": carbon_breakdown.get('food', 0),
+        "energy": carbon_breakdown.get('energy', 0),
+        "activity_summary": activity_summary,
+        "highest_category": highest_category.capitalize(),
+        "highest_value": highest_value
+    })
 
 if __name__ == "__main__":
     # Example usage / Verification